@@ -1,11 +1,17 @@
 from docx import Document
+import re
 import requests
 import json
 import pandas as pd
+from urllib.parse import urlparse, parse_qs
+from asistentemem.store import open_store
 
 document_text = ""
 api_text = ""
 
+# Rows of the stored dataset history shown to the model with each API query
+MAX_FILAS_HISTORIA = 60
+
 
 def cargar_documento(archivo):
     """Load and process a .docx document"""
@@ -28,6 +34,37 @@ def cargar_documento(archivo):
     ]
 
 
+def guardar_datos_api(url, df_pivot):
+    """Append the pivoted SIMEM data to the time-series store of its dataset.
+
+    Returns the latest stored history of the dataset (at least the rows of
+    ``df_pivot``), or ``df_pivot`` itself when it cannot be stored.
+    """
+    parsed = urlparse(url)
+    dataset_id = parse_qs(parsed.query).get("datasetid", [""])[0]
+    # Only SIMEM datasets with a safe id are stored; the id is used as a path
+    host = parsed.hostname or ""
+    if host != "simem.co" and not host.endswith(".simem.co"):
+        print(f"[DEBUG] Not storing data from non-SIMEM URL: {url}")
+        return df_pivot
+    if not re.fullmatch(r"[A-Za-z0-9_-]+", dataset_id):
+        print(f"[DEBUG] Not storing data: invalid datasetid {dataset_id!r}")
+        return df_pivot
+    try:
+        store = open_store(f"simem_{dataset_id}")
+        store.append(df_pivot)
+        print(f"[DEBUG] Stored {len(df_pivot)} rows; history length: {len(store)}")
+        historia = store.to_frame(last=max(MAX_FILAS_HISTORIA, len(df_pivot)))
+        historia.index.name = df_pivot.index.name
+        return historia
+    except ValueError as e:
+        # e.g. hourly datasets, which the daily store does not accept
+        print(f"[DEBUG] Not storing dataset {dataset_id}: {str(e)}")
+    except Exception as e:
+        print(f"[ERROR] Failed to store API data: {str(e)}")
+    return df_pivot
+
+
 def obtener_datos_api(url):
     """Retrieve and process API data"""
     global api_text
@@ -50,7 +87,13 @@ def obtener_datos_api(url):
                 # Pivotear la tabla: "CodigoVariable" serán las columnas, "Valor" el contenido
                 df_pivot = df.pivot(
                     index="Fecha", columns="CodigoVariable", values="Valor"
-                ).reset_index()
+                )
+
+                # Guardar la consulta en la historia del dataset y mostrar al
+                # modelo también los días guardados en consultas anteriores
+                df_pivot = guardar_datos_api(url, df_pivot)
+
+                df_pivot = df_pivot.reset_index()
 
                 # Cambiar el formato de la fecha a "DD-MM-YYYY"
                 df_pivot["Fecha"] = df_pivot["Fecha"].dt.strftime("%d-%m-%Y")
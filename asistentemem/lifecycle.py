@@ -0,0 +1,387 @@
+import gc
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Possible states for a managed model
+UNLOADED = "unloaded"
+LOADING = "loading"
+READY = "ready"
+UNLOADING = "unloading"
+
+ESTADOS_UI = {
+    UNLOADED: "⚪ Descargado",
+    LOADING: "🟡 Cargando...",
+    READY: "🟢 Listo",
+    UNLOADING: "🟠 Liberando...",
+}
+
+
+class ModelNotReady(Exception):
+    """Raised when a model is requested without waiting and it is not loaded yet"""
+
+
+def rss_mb():
+    """Return the current resident memory of the process in MB.
+
+    Returns None when only the peak RSS is available (no psutil and no
+    /proc), since a value that never goes down cannot drive evictions.
+    """
+    try:
+        import psutil
+
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def vram_mb():
+    """Return the CUDA memory allocated by torch in MB (0 if torch/CUDA is absent)"""
+    try:
+        import torch
+    except ImportError:
+        return 0.0
+    if not torch.cuda.is_available():
+        return 0.0
+    return torch.cuda.memory_allocated() / (1024 * 1024)
+
+
+class ManagedModel:
+    """Bookkeeping for a single model registered in the lifecycle manager"""
+
+    def __init__(self, name, loader, unloader=None, warmup=None, idle_timeout=None):
+        self.name = name
+        self.loader = loader
+        self.unloader = unloader
+        self.warmup = warmup
+        self.idle_timeout = idle_timeout
+        self.resource = None
+        self.state = UNLOADED
+        self.refcount = 0
+        self.last_used = 0.0
+        self.pending_unload = False
+        self.error = None
+        self.loads = 0
+        self.unloads = 0
+        self.evictions = 0
+        self.last_load_seconds = None
+
+
+class ModelLifecycleManager:
+    """Load, share and release heavy models under idle and memory limits.
+
+    Models are registered with a loader (returns the loaded object), an optional
+    unloader and an optional warmup. Callers use ``acquire`` so a model is never
+    unloaded while a generation is using it; a background monitor unloads idle
+    models and evicts the least recently used ones when RSS/VRAM go over the
+    configured ceilings.
+    """
+
+    def __init__(
+        self, idle_timeout=900, max_rss_mb=None, max_vram_mb=None, check_interval=30
+    ):
+        self.idle_timeout = idle_timeout
+        self.max_rss_mb = max_rss_mb
+        self.max_vram_mb = max_vram_mb
+        self.check_interval = check_interval
+        self._models = {}
+        self._cond = threading.Condition()
+        self._monitor = None
+        self._stop = threading.Event()
+
+    def register(self, name, loader, unloader=None, warmup=None, idle_timeout=None):
+        """Register a model; ``idle_timeout`` overrides the manager default"""
+        with self._cond:
+            self._models[name] = ManagedModel(
+                name, loader, unloader, warmup, idle_timeout
+            )
+        self._start_monitor()
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+    def load(self, name):
+        """Load the model synchronously (no-op if it is already loaded)"""
+        with self._cond:
+            entry = self._models[name]
+            while True:
+                self._wait_while(entry, UNLOADING)
+                if entry.state == READY:
+                    return entry.resource
+                if entry.state != LOADING:
+                    break
+                self._wait_while(entry, LOADING)
+                if entry.state == READY:
+                    return entry.resource
+                if entry.error is not None:
+                    raise RuntimeError(entry.error)
+                # The load succeeded but a deferred unload released it right
+                # away; nothing failed, so load it again for this caller
+
+            entry.state = LOADING
+            entry.error = None
+            entry.pending_unload = False
+
+        return self._do_load(entry)
+
+    def preload(self, name):
+        """Start loading the model (and its warmup) in a background thread"""
+        with self._cond:
+            entry = self._models[name]
+            if entry.state in (LOADING, READY):
+                return
+        threading.Thread(
+            target=self._safe_load, args=(name,), name=f"load-{name}", daemon=True
+        ).start()
+
+    def _safe_load(self, name):
+        try:
+            self.load(name)
+        except Exception as e:
+            print(f"[ERROR] Background load of '{name}' failed: {str(e)}")
+
+    def _do_load(self, entry):
+        print(f"[DEBUG] Loading model '{entry.name}'...")
+        start = time.perf_counter()
+        try:
+            resource = entry.loader()
+            if entry.warmup is not None:
+                entry.warmup(resource)
+        except Exception as e:
+            with self._cond:
+                entry.state = UNLOADED
+                entry.error = str(e)
+                entry.pending_unload = False
+                self._cond.notify_all()
+            print(f"[ERROR] Failed to load model '{entry.name}': {str(e)}")
+            raise
+
+        elapsed = time.perf_counter() - start
+        with self._cond:
+            entry.resource = resource
+            entry.state = READY
+            entry.last_used = time.monotonic()
+            entry.loads += 1
+            entry.last_load_seconds = elapsed
+            unload_now = entry.pending_unload and entry.refcount == 0
+            self._cond.notify_all()
+        print(f"[DEBUG] Model '{entry.name}' ready in {elapsed:.1f}s")
+        if unload_now:
+            # An unload was requested while loading: honour it now
+            self.unload(entry.name)
+            return resource
+        # Make room for the new model, but never evict it right after loading
+        self._enforce_memory_limits(keep=entry.name)
+        return resource
+
+    # ------------------------------------------------------------------
+    # Using
+    # ------------------------------------------------------------------
+    @contextmanager
+    def acquire(self, name, wait=True):
+        """Hold a reference to a loaded model for the duration of the block.
+
+        With ``wait=False`` a model that is not ready triggers a background load
+        and ``ModelNotReady`` is raised instead of blocking the caller.
+        """
+        entry = self._models[name]
+        while True:
+            with self._cond:
+                if entry.state == READY:
+                    entry.refcount += 1
+                    entry.last_used = time.monotonic()
+                    break
+            if not wait:
+                self.preload(name)
+                raise ModelNotReady(name)
+            # The model may be unloaded again between load() and taking the
+            # reference, so loop until the reference is actually held
+            self.load(name)
+
+        try:
+            yield entry.resource
+        finally:
+            with self._cond:
+                entry.refcount -= 1
+                entry.last_used = time.monotonic()
+                run_unload = entry.refcount == 0 and entry.pending_unload
+            if run_unload:
+                self.unload(name)
+
+    # ------------------------------------------------------------------
+    # Unloading
+    # ------------------------------------------------------------------
+    def unload(self, name, reason="manual"):
+        """Release the model; deferred until loading finishes and the last
+        reference is released"""
+        with self._cond:
+            entry = self._models[name]
+            if entry.state == LOADING:
+                entry.pending_unload = True
+                print(f"[DEBUG] Unload of '{name}' deferred: model loading")
+                return False
+            if entry.state != READY:
+                return False
+            if entry.refcount > 0:
+                entry.pending_unload = True
+                print(f"[DEBUG] Unload of '{name}' deferred: model in use")
+                return False
+            entry.state = UNLOADING
+            entry.pending_unload = False
+            resource = entry.resource
+            entry.resource = None
+
+        print(f"[DEBUG] Unloading model '{name}' ({reason})")
+        try:
+            if entry.unloader is not None:
+                entry.unloader(resource)
+        except Exception as e:
+            print(f"[ERROR] Unloader of '{name}' failed: {str(e)}")
+        del resource
+        gc.collect()
+        try:
+            import torch
+
+            if torch.cuda.is_available():
+                torch.cuda.empty_cache()
+        except ImportError:
+            pass
+
+        with self._cond:
+            entry.state = UNLOADED
+            entry.unloads += 1
+            if reason == "memory":
+                entry.evictions += 1
+            self._cond.notify_all()
+        return True
+
+    def unload_all(self):
+        """Release every registered model (used at interpreter exit)"""
+        self._stop.set()
+        for name in list(self._models):
+            self.unload(name)
+
+    # ------------------------------------------------------------------
+    # Monitoring
+    # ------------------------------------------------------------------
+    def _start_monitor(self):
+        if self._monitor is not None:
+            return
+        self._monitor = threading.Thread(
+            target=self._monitor_loop, name="model-lifecycle", daemon=True
+        )
+        self._monitor.start()
+
+    def _monitor_loop(self):
+        while not self._stop.wait(self.check_interval):
+            self._unload_idle()
+            self._enforce_memory_limits()
+
+    def _unload_idle(self):
+        now = time.monotonic()
+        with self._cond:
+            idle = [
+                entry.name
+                for entry in self._models.values()
+                if entry.state == READY
+                and entry.refcount == 0
+                and self._timeout_for(entry)
+                and now - entry.last_used > self._timeout_for(entry)
+            ]
+        for name in idle:
+            self.unload(name, reason="idle")
+
+    def _timeout_for(self, entry):
+        if entry.idle_timeout is not None:
+            return entry.idle_timeout
+        return self.idle_timeout
+
+    def _over_limits(self):
+        if self.max_rss_mb is not None:
+            rss = rss_mb()
+            # Without a current RSS reading the RSS ceiling is disabled
+            if rss is not None and rss > self.max_rss_mb:
+                return True
+        return self.max_vram_mb is not None and vram_mb() > self.max_vram_mb
+
+    def _enforce_memory_limits(self, keep=None):
+        """Evict least recently used idle models until memory is under the ceiling"""
+        while self._over_limits():
+            with self._cond:
+                candidates = sorted(
+                    (
+                        entry
+                        for entry in self._models.values()
+                        if entry.state == READY
+                        and entry.refcount == 0
+                        and entry.name != keep
+                    ),
+                    key=lambda entry: entry.last_used,
+                )
+            if not candidates:
+                return
+            self.unload(candidates[0].name, reason="memory")
+
+    def _wait_while(self, entry, state):
+        while entry.state == state:
+            self._cond.wait()
+
+    # ------------------------------------------------------------------
+    # Status
+    # ------------------------------------------------------------------
+    def state(self, name):
+        return self._models[name].state
+
+    def status(self):
+        """Return a snapshot of every model's state and counters"""
+        now = time.monotonic()
+        with self._cond:
+            return {
+                name: {
+                    "state": entry.state,
+                    "in_use": entry.refcount,
+                    "idle_seconds": (
+                        round(now - entry.last_used, 1)
+                        if entry.state == READY
+                        else None
+                    ),
+                    "loads": entry.loads,
+                    "unloads": entry.unloads,
+                    "evictions": entry.evictions,
+                    "last_load_seconds": entry.last_load_seconds,
+                    "error": entry.error,
+                }
+                for name, entry in self._models.items()
+            }
+
+    def metrics(self):
+        """Return process memory together with the per-model status"""
+        rss = rss_mb()
+        return {
+            "rss_mb": None if rss is None else round(rss, 1),
+            "vram_mb": round(vram_mb(), 1),
+            "models": self.status(),
+        }
+
+    def status_markdown(self):
+        """Human readable status for the UI"""
+        data = self.metrics()
+        rss = "n/d" if data["rss_mb"] is None else f"{data['rss_mb']:.0f} MB"
+        lines = [f"**Memoria:** RSS {rss} · VRAM {data['vram_mb']:.0f} MB"]
+        for name, info in data["models"].items():
+            line = f"- **{name}**: {ESTADOS_UI[info['state']]}"
+            if info["in_use"]:
+                line += f" · en uso ({info['in_use']})"
+            if info["last_load_seconds"] is not None:
+                line += f" · última carga {info['last_load_seconds']:.1f}s"
+            if info["error"]:
+                line += f" · ❌ {info['error']}"
+            lines.append(line)
+        return "\n".join(lines)
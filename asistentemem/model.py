@@ -1,6 +1,7 @@
 import torch
 import requests  # added for Ollama API call
 import json
+from contextlib import nullcontext
 from transformers import (
     pipeline,
     BitsAndBytesConfig,
@@ -8,40 +9,53 @@ from transformers import (
     AutoTokenizer,
 )
 from huggingface_hub import login
-import gc
 from asistentemem.speech import generate_tts_audio
 from asistentemem.data import get_document_text, get_api_text
+from asistentemem.lifecycle import ModelLifecycleManager, ModelNotReady
 
 # Global variable for API selection: if True, use Ollama API; if False, use Hugging Face transformers.
 USE_OLLAMA_API = False
 
-# Global variables to store the model, tokenizer, and pipeline
-model = None
-tokenizer = None
-pipe = None
-
-
-def initialize_model():
-    """Initialize the Llama 3.2 model with 4-bit quantization"""
-    global model, tokenizer, pipe
-
-    if pipe is not None:
-        return  # Model already initialized
-
-    # print("[DEBUG] Logging into Hugging Face")
-    # login(token="")  # Add your token here
+# Lifecycle manager shared by the heavy models of the app. The LLM is unloaded
+# after 15 minutes without use and evicted first if memory goes over the limits.
+LLM_NAME = "llm"
+IDLE_TIMEOUT = 15 * 60
+MAX_RSS_MB = None  # e.g. 12000 to evict idle models above ~12 GB of RSS
+MAX_VRAM_MB = None  # e.g. 7000 to evict idle models above ~7 GB of VRAM
+
+MODEL_ID = "meta-llama/Llama-3.2-3B-Instruct"
+
+# Accelerated decoding: "prompt_lookup" drafts tokens by matching n-grams of the
+# prompt (numbers, dates and names copied from the context); "assisted" drafts
+# them with a small model that shares the tokenizer of the main model.
+DRAFT_NAME = "draft"
+DRAFT_MODEL_ID = "meta-llama/Llama-3.2-1B-Instruct"
+DECODING_MODES = [
+    ("Estándar", "none"),
+    ("Prompt lookup (n-gramas del contexto)", "prompt_lookup"),
+    ("Modelo borrador (1B)", "assisted"),
+]
+
+manager = ModelLifecycleManager(
+    idle_timeout=IDLE_TIMEOUT, max_rss_mb=MAX_RSS_MB, max_vram_mb=MAX_VRAM_MB
+)
 
-    # Model ID
-    model_id = "meta-llama/Llama-3.2-3B-Instruct"
 
-    # Create 4-bit quantization config
-    quantization_config = BitsAndBytesConfig(
+def _quantization_config():
+    """4-bit quantization config shared by the main and draft models"""
+    return BitsAndBytesConfig(
         load_in_4bit=True,
         bnb_4bit_compute_dtype=torch.bfloat16,
         bnb_4bit_use_double_quant=True,
         bnb_4bit_quant_type="nf4",
     )
 
+
+def _load_pipeline():
+    """Load the Llama 3.2 model with 4-bit quantization and wrap it in a pipeline"""
+    # print("[DEBUG] Logging into Hugging Face")
+    # login(token="")  # Add your token here
+
     print("[DEBUG] Loading model with quantization config...")
     # Check if CUDA is available
     device = "cuda" if torch.cuda.is_available() else "cpu"
@@ -49,13 +63,13 @@ def initialize_model():
 
     # Load model and tokenizer separately with quantization
     model = AutoModelForCausalLM.from_pretrained(
-        model_id,
-        quantization_config=quantization_config,
+        MODEL_ID,
+        quantization_config=_quantization_config(),
         device_map="auto",
         torch_dtype=torch.bfloat16,
     )
 
-    tokenizer = AutoTokenizer.from_pretrained(model_id)
+    tokenizer = AutoTokenizer.from_pretrained(MODEL_ID)
 
     # Create pipeline with loaded model and tokenizer
     pipe = pipeline(
@@ -64,12 +78,113 @@ def initialize_model():
         tokenizer=tokenizer,
     )
     print("[DEBUG] Model loaded successfully")
+    return pipe
 
 
-def chat_with_huggingface(prompt, top_k, top_p, temperatura, max_tokens, tts_enabled):
-    """Get response using Hugging Face transformers pipeline"""
-    global pipe
+def _load_draft_model():
+    """Load the small draft model used for assisted generation"""
+    print(f"[DEBUG] Loading draft model {DRAFT_MODEL_ID}...")
+    return AutoModelForCausalLM.from_pretrained(
+        DRAFT_MODEL_ID,
+        quantization_config=_quantization_config(),
+        device_map="auto",
+        torch_dtype=torch.bfloat16,
+    )
+
+
+def _warmup_pipeline(pipe):
+    """Run a one-token generation so the first real request does not pay for it"""
+    pipe([{"role": "user", "content": "Hola"}], max_new_tokens=1, do_sample=False)
+
 
+def _release_pipeline(pipe):
+    """Drop the references held by the pipeline so the weights can be freed"""
+    pipe.model = None
+    pipe.tokenizer = None
+
+
+manager.register(
+    LLM_NAME,
+    loader=_load_pipeline,
+    unloader=_release_pipeline,
+    warmup=_warmup_pipeline,
+)
+# The draft model is only loaded the first time assisted decoding is used
+manager.register(DRAFT_NAME, loader=_load_draft_model)
+
+
+def initialize_model():
+    """Load the LLM synchronously (no-op if it is already loaded)"""
+    manager.load(LLM_NAME)
+
+
+def preload_model():
+    """Start loading the LLM in the background without blocking the caller"""
+    manager.preload(LLM_NAME)
+
+
+def reload_model():
+    """Start a background (re)load from the UI and return the updated status"""
+    preload_model()
+    return model_status()
+
+
+def model_status():
+    """Return the state of the managed models as markdown for the UI"""
+    return manager.status_markdown()
+
+
+def build_messages(prompt, document_text, api_text):
+    """Chat messages with the loaded document/API data as system context"""
+    messages = []
+
+    # Add context if available
+    if document_text or api_text:
+        context = f"{document_text}\n\n{api_text}"
+        messages.append(
+            {"role": "system", "content": f"Context information: {context}"}
+        )
+
+    # Add user message
+    messages.append({"role": "user", "content": prompt})
+    return messages
+
+
+def generation_kwargs(
+    top_k, top_p, temperatura, max_tokens, decoding="none", draft_tokens=10
+):
+    """Keyword arguments for the text-generation pipeline.
+
+    A temperature of 0 means greedy decoding, which gives the same output with
+    and without accelerated decoding.
+    """
+    if temperatura <= 0:
+        kwargs = {"max_new_tokens": max_tokens, "do_sample": False}
+    else:
+        kwargs = {
+            "max_new_tokens": max_tokens,
+            "top_k": top_k,
+            "top_p": top_p,
+            "temperature": temperatura,
+            "do_sample": True,
+        }
+
+    if decoding == "prompt_lookup":
+        kwargs["prompt_lookup_num_tokens"] = int(draft_tokens)
+    return kwargs
+
+
+def chat_with_huggingface(
+    prompt,
+    top_k,
+    top_p,
+    temperatura,
+    max_tokens,
+    tts_enabled,
+    decoding="none",
+    draft_tokens=10,
+):
+    """Get response using Hugging Face transformers pipeline"""
     print(f"[DEBUG] Chatting with Hugging Face: prompt='{prompt}'")
     if not prompt.strip():
         return [
@@ -79,10 +194,6 @@ def chat_with_huggingface(prompt, top_k, top_p, temperatura, max_tokens, tts_ena
             }
         ], None
 
-    # Initialize model if not already loaded
-    if pipe is None:
-        initialize_model()
-
     document_text = get_document_text()
     api_text = get_api_text()
     print(
@@ -90,28 +201,24 @@ def chat_with_huggingface(prompt, top_k, top_p, temperatura, max_tokens, tts_ena
     )
 
     # Create messages format for the model
-    messages = []
-
-    # Add context if available
-    if document_text or api_text:
-        context = f"{document_text}\n\n{api_text}"
-        messages.append(
-            {"role": "system", "content": f"Context information: {context}"}
-        )
-
-    # Add user message
-    messages.append({"role": "user", "content": prompt})
+    messages = build_messages(prompt, document_text, api_text)
+    kwargs = generation_kwargs(
+        top_k, top_p, temperatura, max_tokens, decoding, draft_tokens
+    )
 
     try:
-        # Generate response from the model
-        outputs = pipe(
-            messages,
-            max_new_tokens=max_tokens,
-            top_k=top_k,
-            top_p=top_p,
-            temperature=temperatura,
-            do_sample=True,
+        # Hold the model while generating so it cannot be unloaded mid-request.
+        # If it is not loaded, a background reload starts instead of blocking.
+        draft_context = (
+            manager.acquire(DRAFT_NAME, wait=False)
+            if decoding == "assisted"
+            else nullcontext()
         )
+        with manager.acquire(LLM_NAME, wait=False) as pipe, draft_context as draft:
+            if draft is not None:
+                draft.generation_config.num_assistant_tokens = int(draft_tokens)
+                kwargs["assistant_model"] = draft
+            outputs = pipe(messages, **kwargs)
         print(f"[DEBUG] Raw model output: {outputs}")
 
         assistant_message = outputs[0]["generated_text"][-1]["content"]
@@ -123,6 +230,14 @@ def chat_with_huggingface(prompt, top_k, top_p, temperatura, max_tokens, tts_ena
             {"role": "user", "content": prompt},
             {"role": "assistant", "content": assistant_message},
         ], audio_path
+    except ModelNotReady:
+        return [
+            {"role": "user", "content": prompt},
+            {
+                "role": "assistant",
+                "content": "⏳ El modelo se está cargando, intente de nuevo en unos segundos.",
+            },
+        ], None
     except Exception as e:
         error_message = f"Error generating response: {str(e)}"
         print(f"[ERROR] {error_message}")
@@ -132,8 +247,17 @@ def chat_with_huggingface(prompt, top_k, top_p, temperatura, max_tokens, tts_ena
         ], None
 
 
-def chat_with_ollama_api(prompt, top_k, top_p, temperatura, max_tokens, tts_enabled):
-    """Get response using the Ollama API call"""
+def chat_with_ollama_api(
+    prompt,
+    top_k,
+    top_p,
+    temperatura,
+    max_tokens,
+    tts_enabled,
+    decoding="none",
+    draft_tokens=10,
+):
+    """Get response using the Ollama API call (accelerated decoding is not used)"""
     api_url = "http://localhost:11434/api/chat"
 
     document_text = get_document_text()
@@ -192,7 +316,16 @@ def chat_with_ollama_api(prompt, top_k, top_p, temperatura, max_tokens, tts_enab
     ], audio_path
 
 
-def chat(prompt, top_k, top_p, temperatura, max_tokens, tts_enabled):
+def chat(
+    prompt,
+    top_k,
+    top_p,
+    temperatura,
+    max_tokens,
+    tts_enabled,
+    decoding="none",
+    draft_tokens=10,
+):
     """Selects the API call based on the global preference"""
     print(f"[DEBUG] chat() called with prompt: {prompt}")
     if USE_OLLAMA_API:
@@ -201,25 +334,24 @@ def chat(prompt, top_k, top_p, temperatura, max_tokens, tts_enabled):
         )
     else:
         return chat_with_huggingface(
-            prompt, top_k, top_p, temperatura, max_tokens, tts_enabled
+            prompt,
+            top_k,
+            top_p,
+            temperatura,
+            max_tokens,
+            tts_enabled,
+            decoding,
+            draft_tokens,
         )
 
 
 def cleanup_model():
     """Clean up the model resources to free memory"""
-    global model, tokenizer, pipe
-
-    if pipe is not None:
-        del pipe
-    if model is not None:
-        del model
-    if tokenizer is not None:
-        del tokenizer
-
-    pipe, model, tokenizer = None, None, None
-    gc.collect()
+    manager.unload(LLM_NAME)
+    print("[DEBUG] Model resources cleaned up")
+    return model_status()
 
-    if torch.cuda.is_available():
-        torch.cuda.empty_cache()
 
-    print("[DEBUG] Model resources cleaned up")
+def shutdown():
+    """Release every managed model when the process exits"""
+    manager.unload_all()
@@ -0,0 +1,253 @@
+import json
+import os
+import re
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows: only in-process locking is available
+    fcntl = None
+
+# Directory where every time series of the app is stored
+STORE_DIR = "historia"
+
+
+class TimeSeriesStore:
+    """Daily time series stored as memory-mapped NumPy arrays with a date index.
+
+    Each store is a directory with ``meta.json`` plus one values file
+    (rows x columns, float64) and one dates file (datetime64[D]) per
+    generation. Files are preallocated with spare capacity, so appending only
+    writes the new rows and then commits the new length by atomically replacing
+    ``meta.json``; readers never see a half written append. When the capacity
+    runs out, new columns appear or rows arrive for earlier dates, a new
+    generation is written and committed the same way.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._meta = None
+        self._meta_key = None
+        self._arrays = None
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+    def _meta_path(self):
+        return os.path.join(self.path, "meta.json")
+
+    def _data_paths(self, generation):
+        return (
+            os.path.join(self.path, f"valores.{generation}.npy"),
+            os.path.join(self.path, f"fechas.{generation}.npy"),
+        )
+
+    def _refresh(self):
+        """Reload the metadata (and reopen the arrays) if another writer committed"""
+        try:
+            stat = os.stat(self._meta_path())
+        except FileNotFoundError:
+            self._meta, self._meta_key, self._arrays = None, None, None
+            return
+        # os.replace gives the file a new inode, so this detects every commit
+        key = (stat.st_ino, stat.st_mtime_ns)
+        if key == self._meta_key:
+            return
+        with open(self._meta_path()) as f:
+            meta = json.load(f)
+        if self._meta is None or meta["generation"] != self._meta["generation"]:
+            valores_path, fechas_path = self._data_paths(meta["generation"])
+            self._arrays = (
+                np.load(valores_path, mmap_mode="r"),
+                np.load(fechas_path, mmap_mode="r"),
+            )
+        self._meta, self._meta_key = meta, key
+
+    def exists(self):
+        self._refresh()
+        return self._meta is not None
+
+    def __len__(self):
+        self._refresh()
+        return 0 if self._meta is None else self._meta["length"]
+
+    @property
+    def columns(self):
+        self._refresh()
+        return [] if self._meta is None else list(self._meta["columns"])
+
+    def tail(self, n=None):
+        """Dates and values of the last ``n`` days (all if None) as zero-copy views"""
+        self._refresh()
+        if self._meta is None:
+            return np.empty(0, dtype="datetime64[D]"), np.empty((0, 0))
+        length = self._meta["length"]
+        start = 0 if n is None else max(0, length - n)
+        valores, fechas = self._arrays
+        return fechas[start:length], valores[start:length]
+
+    def between(self, start, end):
+        """Dates and values with ``start <= fecha <= end`` as zero-copy views"""
+        fechas, valores = self.tail()
+        i = np.searchsorted(fechas, np.datetime64(start, "D"), side="left")
+        j = np.searchsorted(fechas, np.datetime64(end, "D"), side="right")
+        return fechas[i:j], valores[i:j]
+
+    def to_frame(self, last=None):
+        """DataFrame view of the last ``last`` days (all if None)"""
+        fechas, valores = self.tail(last)
+        return pd.DataFrame(
+            valores,
+            index=pd.DatetimeIndex(fechas, name=self._index_name()),
+            columns=self.columns,
+            copy=False,
+        )
+
+    def _index_name(self):
+        return None if self._meta is None else self._meta.get("index_name")
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+    @contextmanager
+    def _writing(self):
+        """Serialize writers inside the process and, where possible, across processes"""
+        with self._lock:
+            os.makedirs(self.path, exist_ok=True)
+            with open(os.path.join(self.path, ".lock"), "w") as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    self._refresh()
+                    yield
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _normalize(df):
+        """Daily DatetimeIndex, float columns, sorted and without repeated dates"""
+        df = df.copy()
+        index = pd.to_datetime(df.index)
+        # Only daily data fits; truncating intraday timestamps would lose rows
+        if (index != index.normalize()).any():
+            raise ValueError("TimeSeriesStore only accepts daily timestamps")
+        df.index = index
+        df = df[~df.index.duplicated(keep="last")].sort_index()
+        return df.apply(pd.to_numeric, errors="coerce").astype(np.float64)
+
+    def append(self, df):
+        """Add the rows of ``df`` (indexed by date); existing dates are updated.
+
+        Raises ``ValueError`` if the index has intraday timestamps.
+        """
+        df = self._normalize(df)
+        if df.empty:
+            return 0
+        with self._writing():
+            if self._meta is None:
+                self._write_generation(df, 0)
+                return len(df)
+
+            columns = self.columns
+            nuevas = [c for c in df.columns if c not in columns]
+            fechas, _ = self.tail()
+            nuevas_fechas = df.index.values.astype("datetime64[D]")
+            en_orden = len(fechas) == 0 or nuevas_fechas[0] > fechas[-1]
+            length = self._meta["length"]
+
+            if nuevas or not en_orden or length + len(df) > self._meta["capacity"]:
+                # Rewrite everything as a new generation (new columns, rows in
+                # the middle or no spare capacity left). Existing dates only get
+                # the values present in ``df``; other columns are kept
+                combinado = df.combine_first(self.to_frame())
+                combinado = combinado[columns + nuevas].sort_index()
+                self._write_generation(combinado, self._meta["generation"] + 1)
+                return len(df)
+
+            # Fast path: write the new rows past the committed length, then commit
+            valores_path, fechas_path = self._data_paths(self._meta["generation"])
+            valores = np.load(valores_path, mmap_mode="r+")
+            fechas_mm = np.load(fechas_path, mmap_mode="r+")
+            fin = length + len(df)
+            valores[length:fin] = df.reindex(columns=columns).values
+            fechas_mm[length:fin] = nuevas_fechas
+            valores.flush()
+            fechas_mm.flush()
+            del valores, fechas_mm
+            self._commit(dict(self._meta, length=fin))
+            return len(df)
+
+    def replace(self, df):
+        """Atomically replace the whole series with ``df``"""
+        df = self._normalize(df)
+        with self._writing():
+            generation = 0 if self._meta is None else self._meta["generation"] + 1
+            self._write_generation(df, generation)
+
+    def _write_generation(self, df, generation):
+        """Write ``df`` to new files with spare capacity and commit them"""
+        length = len(df)
+        capacity = max(64, 2 * length)
+        valores_path, fechas_path = self._data_paths(generation)
+
+        valores = np.lib.format.open_memmap(
+            valores_path, mode="w+", dtype=np.float64, shape=(capacity, df.shape[1])
+        )
+        valores[:length] = df.values
+        valores.flush()
+        fechas = np.lib.format.open_memmap(
+            fechas_path, mode="w+", dtype="datetime64[D]", shape=(capacity,)
+        )
+        fechas[:length] = df.index.values.astype("datetime64[D]")
+        fechas.flush()
+        del valores, fechas
+
+        previous = self._meta
+        self._commit(
+            {
+                "columns": [str(c) for c in df.columns],
+                "index_name": df.index.name,
+                "length": length,
+                "capacity": capacity,
+                "generation": generation,
+            }
+        )
+
+        # Old files can only be removed once nobody maps them (always on POSIX)
+        if previous is not None and previous["generation"] != generation:
+            for old in self._data_paths(previous["generation"]):
+                try:
+                    os.remove(old)
+                except OSError:
+                    pass
+
+    def _commit(self, meta):
+        """Publish new metadata with an atomic rename"""
+        temporal = self._meta_path() + ".tmp"
+        with open(temporal, "w") as f:
+            json.dump(meta, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporal, self._meta_path())
+        self._meta_key = None
+        self._meta = None
+        self._refresh()
+
+
+def open_store(name, csv_fallback=None):
+    """Open the store ``name``; if it is empty, seed it from ``csv_fallback``"""
+    # The name becomes a directory under STORE_DIR, so it must not contain
+    # path separators or ".." components
+    if not re.fullmatch(r"[A-Za-z0-9_-]+", name):
+        raise ValueError(f"Invalid store name: {name!r}")
+    store = TimeSeriesStore(os.path.join(STORE_DIR, name))
+    if not store.exists() and csv_fallback and os.path.exists(csv_fallback):
+        print(f"[DEBUG] Importing {csv_fallback} into store '{name}'")
+        store.append(pd.read_csv(csv_fallback, index_col=0))
+    return store
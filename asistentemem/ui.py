@@ -8,7 +8,7 @@ from asistentemem.data import cargar_documento, obtener_datos_api
 tts_enabled = False
 
 # Register cleanup function to run when Python exits
-atexit.register(model.cleanup_model)
+atexit.register(model.shutdown)
 
 
 def update_tts_state(value):
@@ -23,10 +23,11 @@ def crear_interfaz():
     """Create the Gradio interface"""
     global tts_enabled
 
-    # Initialize the model at startup (if using Hugging Face)
+    # Start loading the model in the background (if using Hugging Face) so the
+    # interface is available while the weights are loaded and warmed up
     if not model.USE_OLLAMA_API:
         print("Initializing model at application startup...")
-        model.initialize_model()
+        model.preload_model()
 
     with gr.Blocks(
         css=""" 
@@ -86,6 +87,7 @@ def crear_interfaz():
                     - **Top K/P**: Controla la diversidad de palabras. Valores bajos = respuestas más directas
                     - **Temperatura**: Alta = más creatividad, Baja = más precisión
                     - **Tokens máximos**: Controla la longitud de la respuesta
+                    - **Decodificación acelerada**: Propone varios tokens por paso (copiados del contexto o de un modelo pequeño) y el modelo los verifica
                     """)
                     top_k_slider = gr.Slider(
                         minimum=1, maximum=50, step=1, value=20, label="🔍 Top K"
@@ -107,6 +109,18 @@ def crear_interfaz():
                         value=300,
                         label="📏 Tokens máximos",
                     )
+                    decoding_dropdown = gr.Dropdown(
+                        choices=model.DECODING_MODES,
+                        value="none",
+                        label="⚡ Decodificación acelerada",
+                    )
+                    draft_tokens_slider = gr.Slider(
+                        minimum=2,
+                        maximum=20,
+                        step=1,
+                        value=10,
+                        label="📝 Tokens de borrador por paso",
+                    )
 
                 tts_checkbox = gr.Checkbox(
                     label="🗣 Activar TTS (Text-to-Speech)",
@@ -120,9 +134,24 @@ def crear_interfaz():
                     placeholder="Introduce una API para el chat",
                 )
 
-                # Add unload model button at the bottom of sidebar
-                unload_model_btn = gr.Button("🧹 Liberar recursos del modelo")
-                unload_model_btn.click(fn=model.cleanup_model, inputs=[], outputs=[])
+                # Model state (loading/ready/unloading) and memory usage
+                gr.Markdown("📊 **Estado del modelo**")
+                model_status_md = gr.Markdown(model.model_status())
+                status_timer = gr.Timer(5)
+                status_timer.tick(
+                    fn=model.model_status, inputs=[], outputs=[model_status_md]
+                )
+
+                # Add load/unload model buttons at the bottom of sidebar
+                with gr.Row():
+                    load_model_btn = gr.Button("🔄 Cargar modelo")
+                    unload_model_btn = gr.Button("🧹 Liberar recursos del modelo")
+                load_model_btn.click(
+                    fn=model.reload_model, inputs=[], outputs=[model_status_md]
+                )
+                unload_model_btn.click(
+                    fn=model.cleanup_model, inputs=[], outputs=[model_status_md]
+                )
 
         sidebar_state = gr.State(False)
 
@@ -148,6 +177,8 @@ def crear_interfaz():
                 temperatura_slider,
                 max_tokens_slider,
                 tts_checkbox,
+                decoding_dropdown,
+                draft_tokens_slider,
             ],
             outputs=[chatbot, audio_output],
         )
@@ -0,0 +1,556 @@
+import json
+import multiprocessing
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+
+import joblib
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from sklearn.base import clone
+from workalendar.america import Colombia
+
+from asistentemem.store import STORE_DIR, open_store
+
+# ===========================
+# 🔹 Configuración del backtest
+# ===========================
+HISTORIA = "df_scaled"  # Serie del almacén (asistentemem.store)
+RUTA_DATOS = "df_scaled.csv"  # Solo para crear el almacén la primera vez
+RUTA_MODELO = "pbolsa.keras"  # Modelo y scaler originales (antes de reentrenar)
+RUTA_SCALER = "scaler.pkl"
+# Versión vigente (modelo, scaler, historia escalada y corte); se reemplaza de
+# una sola vez al publicar un modelo nuevo en CARPETA_VERSIONES
+RUTA_MANIFIESTO = "pbolsa.json"
+CARPETA_VERSIONES = "modelos"
+OBJETIVO = "Precio_bolsa"
+PRECIO_MARCADOR = 244  # Valor de relleno del día a predecir (igual que preciobolsa.py)
+
+SEQ_LENGTH = 30  # Días por ventana (el modelo espera (30, 13))
+HORIZONTES = 7  # Días hacia adelante evaluados de forma recursiva
+N_FOLDS = 4  # Pliegues walk-forward
+TAMANO_TEST = 60  # Días de prueba por pliegue
+EPOCHS = 30
+BATCH_SIZE = 64  # También limita la memoria de la evaluación
+
+# Variables que se descargan de XM con pydataxm: (métrica, entidad). Los valores
+# horarios y los de varias entidades (p. ej. plantas solares) se promedian por día
+FUENTES_XM = {
+    "Precio_bolsa": ("PrecBolsNaci", "Sistema"),
+    "Demanda_real": ("DemaReal", "Sistema"),
+    "Capacidad_embalse": ("CapaUtilDiarEner", "Sistema"),
+    "Irradiacion": ("IrrPanel", "Recurso"),
+    "Temperatura": ("TempAmbSolar", "Recurso"),
+}
+# Almacén del conjunto de precios de escasez de SIMEM (lo llenan simem.py y el chat)
+SIMEM_ESCASEZ = "simem_ae3f23"
+
+
+# ===========================
+# 🔹 Versión vigente del modelo
+# ===========================
+def leer_manifiesto():
+    """Archivos de la versión vigente del modelo.
+
+    Sin manifiesto (antes del primer reentrenamiento) se usan los archivos
+    originales y se asume que el modelo se entrenó con todo ``df_scaled.csv``.
+    """
+    if os.path.exists(RUTA_MANIFIESTO):
+        with open(RUTA_MANIFIESTO) as f:
+            return json.load(f)
+    return {
+        "version": None,
+        "modelo": RUTA_MODELO,
+        "scaler": RUTA_SCALER,
+        "historia": HISTORIA,
+        "corte": None,
+    }
+
+
+def version_modelo():
+    """Marca que cambia cada vez que se publica un modelo (o se reemplazan a mano
+    los archivos originales); preciobolsa.py la usa para recargarlo en caliente"""
+    if os.path.exists(RUTA_MANIFIESTO):
+        rutas = [RUTA_MANIFIESTO]
+    else:
+        rutas = [RUTA_MODELO, RUTA_SCALER]
+    return tuple(os.stat(ruta).st_mtime_ns for ruta in rutas)
+
+
+# ===========================
+# 🔹 Datos nuevos (XM y SIMEM)
+# ===========================
+def serie_xm(api, metrica, entidad, inicio, fin):
+    """Serie diaria de una métrica de XM (promedio de las horas y entidades)"""
+    df = api.request_data(metrica, entidad, inicio, fin)
+    if df.empty:
+        return pd.Series(dtype=float)
+    horas = [c for c in df.columns if c.startswith("Values_Hour")]
+    valores = df[horas or ["Values_Value"]].apply(pd.to_numeric, errors="coerce")
+    return valores.mean(axis=1).groupby(df["Date"].dt.normalize()).mean()
+
+
+def calendario(fechas):
+    """Columnas de calendario calculadas como en df_scaled.csv y preciobolsa.py"""
+    cal = Colombia()
+    return pd.DataFrame(
+        {
+            "Holiday": [cal.is_holiday(f) for f in fechas.date],
+            # Igual que en la historia: fines de semana y festivos no son laborales
+            "Business_Day": [cal.is_working_day(f) for f in fechas.date],
+            "Month_sin": np.sin(2 * np.pi * fechas.month / 12),
+            "Month_cos": np.cos(2 * np.pi * fechas.month / 12),
+            "Day_sin": np.sin(2 * np.pi * fechas.day / 31),
+            "Day_cos": np.cos(2 * np.pi * fechas.day / 31),
+        },
+        index=fechas,
+    ).astype(float)
+
+
+def cargar_nuevos(desde, hasta=None):
+    """Datos sin escalar de los días ``desde``..``hasta`` (por defecto, ayer).
+
+    Las variables de FUENTES_XM se descargan con pydataxm y el precio de escasez
+    (mensual) se toma del almacén de SIMEM. Las variables sin fuente
+    (Precio_Oil) quedan vacías y ``cargar_historia`` repite su último valor.
+    Se descartan los días que aún no tienen precio de bolsa.
+    """
+    from pydataxm.pydataxm import ReadDB
+
+    hasta = hasta or date.today() - timedelta(days=1)
+    fechas = pd.date_range(desde, hasta, freq="D", name="Date")
+    if len(fechas) == 0:
+        return pd.DataFrame()
+
+    nuevos = calendario(fechas)
+    api = ReadDB()
+    for columna, (metrica, entidad) in FUENTES_XM.items():
+        serie = serie_xm(api, metrica, entidad, fechas[0].date(), fechas[-1].date())
+        nuevos[columna] = serie.reindex(fechas)
+
+    escasez = open_store(SIMEM_ESCASEZ).to_frame()
+    if "PrecioEscasez" in escasez.columns:
+        # Cada publicación rige hasta la siguiente
+        precio = escasez["PrecioEscasez"].dropna()
+        nuevos["Precio_escasez"] = (
+            precio.reindex(precio.index.union(fechas)).ffill().reindex(fechas)
+        )
+    print(f"[DEBUG] {nuevos[OBJETIVO].notna().sum()} días nuevos de XM/SIMEM")
+    return nuevos.dropna(subset=[OBJETIVO])
+
+
+def cargar_historia(manifiesto, nuevos=None):
+    """Cargar la historia de la versión vigente y, opcionalmente, agregar datos
+    nuevos.
+
+    ``nuevos`` es un DataFrame sin escalar (índice de fechas, columnas de la
+    historia), por ejemplo el de ``cargar_nuevos``. Devuelve la historia escalada
+    con el scaler vigente, la historia sin escalar y ese scaler. Los scalers de
+    los candidatos se ajustan a partir de la historia sin escalar.
+    """
+    df_scaled = open_store(manifiesto["historia"], csv_fallback=RUTA_DATOS).to_frame()
+    scaler = joblib.load(manifiesto["scaler"])
+    crudo = pd.DataFrame(
+        scaler.inverse_transform(df_scaled),
+        index=df_scaled.index,
+        columns=df_scaled.columns,
+    )
+
+    if nuevos is None or len(nuevos) == 0:
+        return df_scaled, crudo, scaler
+
+    nuevos = nuevos.reindex(columns=df_scaled.columns).astype(float)
+    nuevos.index = pd.to_datetime(nuevos.index)
+    crudo = pd.concat([crudo, nuevos])
+    crudo = crudo[~crudo.index.duplicated(keep="last")].sort_index()
+    # Las variables sin dato en los días nuevos repiten el último valor conocido
+    crudo = crudo.ffill()
+
+    df_actual = pd.DataFrame(
+        scaler.transform(crudo), index=crudo.index, columns=crudo.columns
+    )
+    return df_actual, crudo, scaler
+
+
+def ajustar_scaler(scaler, crudo):
+    """Scaler nuevo (misma clase y parámetros) ajustado con ``crudo``.
+
+    Se ajusta sobre el DataFrame para conservar los nombres de las columnas
+    (feature_names_in_). Devuelve el scaler y ``crudo`` escalado.
+    """
+    scaler_nuevo = clone(scaler).fit(crudo)
+    df_nuevo = pd.DataFrame(
+        scaler_nuevo.transform(crudo), index=crudo.index, columns=crudo.columns
+    )
+    return scaler_nuevo, df_nuevo
+
+
+def desnormalizar_precio(scaler, valores, n_columnas, columna):
+    """Llevar valores escalados de la columna objetivo a unidades de precio"""
+    valores = np.asarray(valores, dtype=float)
+    temp_array = np.zeros((valores.size, n_columnas))
+    temp_array[:, columna] = valores.ravel()
+    return scaler.inverse_transform(temp_array)[:, columna].reshape(valores.shape)
+
+
+def marcador_escalado(scaler, columnas):
+    """Valor escalado que preciobolsa.py pone como Precio_bolsa del día a predecir"""
+    fila = pd.DataFrame(np.zeros((1, len(columnas))), columns=columnas)
+    fila[OBJETIVO] = PRECIO_MARCADOR
+    return float(scaler.transform(fila)[0, columnas.get_loc(OBJETIVO)])
+
+
+def leer_corte(indice, manifiesto):
+    """Posición del primer día que el modelo vigente no vio al entrenarse"""
+    if manifiesto["corte"] is not None:
+        corte = pd.Timestamp(manifiesto["corte"])
+    else:
+        corte = pd.Timestamp(pd.read_csv(RUTA_DATOS, index_col=0).index[-1])
+    return int(indice.searchsorted(corte, side="right"))
+
+
+def generar_folds(n, n_folds=N_FOLDS, tamano_test=TAMANO_TEST):
+    """Límites (inicio_test, fin_test) de cada pliegue walk-forward"""
+    folds = []
+    for k in range(n_folds):
+        inicio = n - (n_folds - k) * tamano_test
+        if inicio - SEQ_LENGTH < tamano_test:
+            continue  # No hay suficiente historia para entrenar este pliegue
+        folds.append((inicio, inicio + tamano_test))
+    return folds
+
+
+def dataset_entrenamiento(datos, columna, marcador, inicio, fin, shuffle=True):
+    """tf.data con ventanas (30, 13) -> precio del último día, sin copiarlas.
+
+    Igual que en preciobolsa.py, la ventana del día ``t`` son los 29 días
+    anteriores más la fila del propio día ``t`` con el precio reemplazado por el
+    marcador. Se generan los días ``inicio <= t < fin``.
+    """
+    import tensorflow as tf
+
+    dataset = tf.keras.utils.timeseries_dataset_from_array(
+        data=datos[inicio - SEQ_LENGTH + 1 : fin],
+        targets=datos[inicio:fin, columna],
+        sequence_length=SEQ_LENGTH,
+        batch_size=BATCH_SIZE,
+        shuffle=shuffle,
+        seed=42,
+    )
+    mascara = tf.one_hot(columna, datos.shape[1], dtype=datos.dtype)
+
+    def ocultar_precio(X, y):
+        ultimo = X[:, -1:, :] * (1 - mascara) + marcador * mascara
+        return tf.concat([X[:, :-1, :], ultimo], axis=1), y
+
+    return dataset.map(ocultar_precio)
+
+
+def entrenar(
+    datos, columna, marcador, fin, ruta_modelo=RUTA_MODELO, epochs=EPOCHS, verbose=0
+):
+    """Entrenar desde cero (misma arquitectura que ``ruta_modelo``) con los días
+    anteriores a ``fin``"""
+    import tensorflow as tf
+
+    arquitectura = tf.keras.models.load_model(ruta_modelo)
+    # clone_model crea pesos nuevos: el candidato no hereda lo que el modelo
+    # vigente aprendió de los días de prueba
+    modelo = tf.keras.models.clone_model(arquitectura)
+    modelo.compile(optimizer="adam", loss="mse")
+
+    # Los últimos días del tramo de entrenamiento sirven de validación
+    corte_val = fin - TAMANO_TEST // 2
+    entrenamiento = dataset_entrenamiento(
+        datos, columna, marcador, SEQ_LENGTH - 1, corte_val
+    )
+    validacion = dataset_entrenamiento(
+        datos, columna, marcador, corte_val, fin, shuffle=False
+    )
+    modelo.fit(
+        entrenamiento,
+        validation_data=validacion,
+        epochs=epochs,
+        verbose=verbose,
+        callbacks=[
+            tf.keras.callbacks.EarlyStopping(
+                monitor="val_loss", patience=5, restore_best_weights=True
+            )
+        ],
+    )
+    return modelo
+
+
+def predecir_recursivo(
+    modelo, datos, columna, marcador, origenes, horizontes=HORIZONTES
+):
+    """Predicciones de los días t..t+H-1 para cada origen t, alimentando el
+    modelo con sus propias predicciones de precio (las demás variables se toman
+    reales).
+
+    Las ventanas se leen de una vista deslizante de ``datos`` y solo se copia un
+    lote de ``BATCH_SIZE`` ventanas a la vez. Devuelve un array (orígenes, H).
+    """
+    ventanas = sliding_window_view(datos, SEQ_LENGTH, axis=0)  # (n - 29, 13, 30)
+    predicciones = np.empty((len(origenes), horizontes))
+
+    for inicio in range(0, len(origenes), BATCH_SIZE):
+        lote = np.asarray(origenes[inicio : inicio + BATCH_SIZE])
+        # Ventana del día t: datos[t - 29:t + 1] con el precio de t oculto
+        X = np.ascontiguousarray(ventanas[lote - SEQ_LENGTH + 1].transpose(0, 2, 1))
+        X[:, -1, columna] = marcador
+        for h in range(horizontes):
+            pred = modelo(X, training=False).numpy().reshape(-1)
+            predicciones[inicio : inicio + len(lote), h] = pred
+            if h + 1 < horizontes:
+                # El día predicho pasa a la historia con su precio estimado y se
+                # agrega el día siguiente con el precio oculto
+                X[:, -1, columna] = pred
+                siguiente = datos[lote + h + 1].copy()
+                siguiente[:, columna] = marcador
+                X = np.concatenate([X[:, 1:], siguiente[:, None, :]], axis=1)
+    return predicciones
+
+
+def metricas(reales, predichos):
+    """MAE y MAPE (%) por horizonte, en unidades de precio (ignora NaN)"""
+    error = np.abs(predichos - reales)
+    relativo = error / np.maximum(np.abs(reales), 1e-8)
+    n = np.maximum((~np.isnan(error)).sum(axis=0), 1)
+    mae = np.nansum(error, axis=0) / n
+    mape = np.nansum(relativo, axis=0) / n * 100
+    vacios = np.isnan(error).all(axis=0)
+    mae[vacios], mape[vacios] = np.nan, np.nan
+    return mae, mape
+
+
+def _configurar_cpu(hilos):
+    """Usar solo CPU y un número acotado de hilos (uno por proceso del pool)"""
+    os.environ["CUDA_VISIBLE_DEVICES"] = "-1"
+    os.environ["TF_CPP_MIN_LOG_LEVEL"] = "2"
+    import tensorflow as tf
+
+    tf.config.threading.set_intra_op_parallelism_threads(hilos)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+
+
+def evaluar_fold(fold, datos_actual, crudo, columna, scaler, ruta_modelo):
+    """Predicciones del modelo vigente y de un candidato entrenado desde cero
+    con los días anteriores al pliegue. Devuelve precios reales y predichos."""
+    import tensorflow as tf
+
+    inicio, fin = fold
+    marcador_actual = marcador_escalado(scaler, crudo.columns)
+    # El scaler del candidato solo ve los días anteriores al pliegue, como su
+    # entrenamiento; los días de prueba pueden quedar fuera de [0, 1]
+    scaler_nuevo = clone(scaler).fit(crudo.iloc[:inicio])
+    datos_nuevo = scaler_nuevo.transform(crudo).astype(np.float32)
+    marcador_nuevo = marcador_escalado(scaler_nuevo, crudo.columns)
+    origenes = np.arange(inicio, fin - HORIZONTES + 1)
+    n_columnas = datos_actual.shape[1]
+
+    # Precio real de cada origen y horizonte, en unidades de precio
+    indices = origenes[:, None] + np.arange(HORIZONTES)
+    reales = desnormalizar_precio(
+        scaler, datos_actual[indices, columna], n_columnas, columna
+    )
+
+    modelo_actual = tf.keras.models.load_model(ruta_modelo)
+    pred_actual = desnormalizar_precio(
+        scaler,
+        predecir_recursivo(
+            modelo_actual, datos_actual, columna, marcador_actual, origenes
+        ),
+        n_columnas,
+        columna,
+    )
+
+    candidato = entrenar(datos_nuevo, columna, marcador_nuevo, inicio, ruta_modelo)
+    pred_candidato = desnormalizar_precio(
+        scaler_nuevo,
+        predecir_recursivo(candidato, datos_nuevo, columna, marcador_nuevo, origenes),
+        n_columnas,
+        columna,
+    )
+    tf.keras.backend.clear_session()
+    return {
+        "fold": fold,
+        "indices": indices,
+        "reales": reales,
+        "actual": pred_actual,
+        "candidato": pred_candidato,
+    }
+
+
+def backtest(manifiesto, df_actual, crudo, scaler, n_procesos=None):
+    """Evaluación walk-forward en paralelo; devuelve la tabla de métricas.
+
+    El candidato siempre se evalúa fuera de muestra. El modelo vigente solo se
+    compara en los días posteriores a su corte de entrenamiento (ver
+    ``leer_corte``); sobre días que ya vio su error no es comparable.
+    """
+    columna = df_actual.columns.get_loc(OBJETIVO)
+    datos_actual = df_actual.values.astype(np.float32)
+    primer_dia_nuevo = leer_corte(df_actual.index, manifiesto)
+
+    folds = generar_folds(len(datos_actual))
+    if not folds:
+        raise ValueError("No hay suficiente historia para el backtest")
+
+    if n_procesos is None:
+        n_procesos = max(1, min(len(folds), (os.cpu_count() or 1) // 2))
+    hilos = max(1, (os.cpu_count() or 1) // n_procesos)
+    print(f"[DEBUG] Backtest con {len(folds)} pliegues en {n_procesos} procesos")
+
+    # "spawn" evita heredar el estado de TensorFlow del proceso principal
+    with ProcessPoolExecutor(
+        max_workers=n_procesos,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_configurar_cpu,
+        initargs=(hilos,),
+    ) as pool:
+        futuros = [
+            pool.submit(
+                evaluar_fold,
+                fold,
+                datos_actual,
+                crudo,
+                columna,
+                scaler,
+                manifiesto["modelo"],
+            )
+            for fold in folds
+        ]
+        resultados = [f.result() for f in futuros]
+
+    filas = []
+    for r in resultados:
+        # Solo los días que el modelo vigente no vio entran en la comparación
+        no_vistos = r["indices"] >= primer_dia_nuevo
+        mae, mape = metricas(r["reales"], r["candidato"])
+        mae_cmp_actual, _ = metricas(
+            np.where(no_vistos, r["reales"], np.nan), r["actual"]
+        )
+        mae_cmp_candidato, _ = metricas(
+            np.where(no_vistos, r["reales"], np.nan), r["candidato"]
+        )
+        for h in range(HORIZONTES):
+            filas.append(
+                {
+                    "fold": r["fold"][0],
+                    "horizonte": h + 1,
+                    "mae_candidato": mae[h],
+                    "mape_candidato": mape[h],
+                    "dias_no_vistos": int(no_vistos[:, h].sum()),
+                    "mae_actual_no_vistos": mae_cmp_actual[h],
+                    "mae_candidato_no_vistos": mae_cmp_candidato[h],
+                }
+            )
+    return pd.DataFrame(filas)
+
+
+def publicar_version(modelo, scaler, df_scaled):
+    """Guardar modelo, scaler e historia escalada como una versión nueva y
+    activarla reemplazando el manifiesto de una sola vez.
+
+    Los archivos de una versión nunca se sobrescriben, así que quien lea el
+    manifiesto (preciobolsa.py) siempre carga un conjunto coherente.
+    """
+    version = datetime.now().strftime("%Y%m%dT%H%M%S")
+    manifiesto = {
+        "version": version,
+        "modelo": os.path.join(CARPETA_VERSIONES, f"pbolsa-{version}.keras"),
+        "scaler": os.path.join(CARPETA_VERSIONES, f"scaler-{version}.pkl"),
+        "historia": f"{HISTORIA}_{version}",
+        "corte": df_scaled.index[-1].strftime("%Y-%m-%d"),
+    }
+    os.makedirs(CARPETA_VERSIONES, exist_ok=True)
+    modelo.save(manifiesto["modelo"])
+    joblib.dump(scaler, manifiesto["scaler"])
+    open_store(manifiesto["historia"]).replace(df_scaled)
+
+    anterior = leer_manifiesto()
+    temporal = f"{RUTA_MANIFIESTO}.tmp"
+    with open(temporal, "w") as f:
+        json.dump(manifiesto, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporal, RUTA_MANIFIESTO)
+    _borrar_versiones(conservar=(manifiesto, anterior))
+    return manifiesto
+
+
+def _borrar_versiones(conservar):
+    """Borrar las versiones viejas; la anterior se conserva por si alguien leyó
+    el manifiesto justo antes del cambio y la está cargando"""
+    archivos = {m[clave] for m in conservar for clave in ("modelo", "scaler")}
+    for nombre in os.listdir(CARPETA_VERSIONES):
+        ruta = os.path.join(CARPETA_VERSIONES, nombre)
+        if ruta not in archivos:
+            os.remove(ruta)
+    historias = {m["historia"] for m in conservar}
+    for nombre in os.listdir(STORE_DIR):
+        if nombre.startswith(f"{HISTORIA}_") and nombre not in historias:
+            shutil.rmtree(os.path.join(STORE_DIR, nombre), ignore_errors=True)
+
+
+def reentrenar(nuevos=None, n_procesos=None):
+    """Backtest y, si el candidato mejora el MAE del modelo vigente en días que
+    este no vio, publicar una versión nueva (modelo, scaler e historia)"""
+    manifiesto = leer_manifiesto()
+    df_actual, crudo, scaler = cargar_historia(manifiesto, nuevos)
+    if leer_corte(df_actual.index, manifiesto) >= len(df_actual):
+        print(
+            "No hay días posteriores al entrenamiento del modelo vigente; "
+            "no se puede comparar y no se entrena nada."
+        )
+        return None
+
+    tabla = backtest(manifiesto, df_actual, crudo, scaler, n_procesos)
+    por_horizonte = tabla.groupby("horizonte")[
+        ["mae_candidato", "mape_candidato"]
+    ].mean()
+    por_horizonte["dias_no_vistos"] = tabla.groupby("horizonte")["dias_no_vistos"].sum()
+    print("Error walk-forward del candidato por horizonte:")
+    print(por_horizonte.round(3).to_string())
+
+    comparables = tabla[tabla["dias_no_vistos"] > 0]
+    if comparables.empty:
+        print(
+            "Los pliegues no incluyen días posteriores al entrenamiento del "
+            "modelo vigente; no se puede comparar y no se guarda nada."
+        )
+        return por_horizonte
+
+    # Promedio ponderado por el número de días no vistos de cada pliegue
+    pesos = comparables["dias_no_vistos"]
+    mae_actual = np.average(comparables["mae_actual_no_vistos"], weights=pesos)
+    mae_candidato = np.average(comparables["mae_candidato_no_vistos"], weights=pesos)
+    print(
+        f"MAE en {int(pesos.sum())} predicciones no vistas · "
+        f"actual: {mae_actual:.3f} · candidato: {mae_candidato:.3f}"
+    )
+    if mae_candidato >= mae_actual:
+        print("El candidato no mejora el modelo actual; no se guarda nada.")
+        return por_horizonte
+
+    # El modelo final se entrena con toda la historia disponible
+    _configurar_cpu(os.cpu_count() or 1)
+    scaler_nuevo, df_nuevo = ajustar_scaler(scaler, crudo)
+    datos = df_nuevo.values.astype(np.float32)
+    columna = df_nuevo.columns.get_loc(OBJETIVO)
+    marcador = marcador_escalado(scaler_nuevo, df_nuevo.columns)
+    modelo = entrenar(datos, columna, marcador, len(datos), manifiesto["modelo"])
+
+    nuevo = publicar_version(modelo, scaler_nuevo, df_nuevo)
+    print(f"✅ Nueva versión {nuevo['version']} publicada en {RUTA_MANIFIESTO}")
+    return por_horizonte
+
+
+if __name__ == "__main__":
+    # Días posteriores a la historia vigente, con datos frescos de XM y SIMEM
+    historia = open_store(leer_manifiesto()["historia"], csv_fallback=RUTA_DATOS)
+    ultimo_dia = historia.to_frame(last=1).index[-1]
+    reentrenar(cargar_nuevos(ultimo_dia + pd.Timedelta(days=1)))
@@ -0,0 +1,143 @@
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+from docx import Document
+
+from asistentemem import model
+
+# ===========================
+# 🔹 Benchmark de decodificación acelerada (temperatura 0)
+# ===========================
+MAX_TOKENS = 200
+DRAFT_TOKENS = 10
+
+# Preguntas que obligan a copiar cifras, fechas y nombres del contexto
+PREGUNTAS = [
+    (
+        "¿Cuáles fueron los valores de PrecioEscasez, PrecioEscasezInferior y "
+        "PrecioEscasezSuperior en cada fecha? Responde con una tabla."
+    ),
+    "Lista todas las variables de la tabla con su fecha y su valor.",
+    "¿Cuál fue el PrecioMarginalEscasez más reciente y en qué fecha?",
+    "Resume el documento citando textualmente las definiciones principales.",
+]
+
+
+def cargar_contexto():
+    """Contexto equivalente al del chat: documento .docx + tabla de la API"""
+    doc = Document("mercadoenergia.docx")
+    document_text = "\n".join(p.text for p in doc.paragraphs if p.text.strip())
+
+    df = pd.read_csv("datos_api.csv")
+    df_pivot = df.pivot(index="Fecha", columns="CodigoVariable", values="Valor")
+    api_text = f"📊 **Conjuntos de dato del API:**\n```\n{df_pivot.to_string()}\n```"
+    return document_text, api_text
+
+
+@contextmanager
+def contar_pasos(pipe):
+    """Contar las pasadas del modelo principal y los tokens propuestos como borrador"""
+    contador = {"pasos": 0, "propuestos": 0}
+
+    def hook(module, args, output):
+        contador["pasos"] += 1
+
+    handle = pipe.model.register_forward_hook(hook)
+
+    # Los generadores de candidatos de transformers exponen get_candidates();
+    # se envuelve para saber cuántos tokens se proponen en cada paso
+    originales = {}
+    try:
+        from transformers.generation import candidate_generator as cg
+
+        clases = [cg.PromptLookupCandidateGenerator, cg.AssistedCandidateGenerator]
+    except (ImportError, AttributeError):
+        clases = []
+    for clase in clases:
+        original = clase.get_candidates
+
+        def get_candidates(self, input_ids, *args, _original=original, **kwargs):
+            resultado = _original(self, input_ids, *args, **kwargs)
+            candidatos = resultado[0]
+            contador["propuestos"] += candidatos.shape[-1] - input_ids.shape[-1]
+            return resultado
+
+        originales[clase] = original
+        clase.get_candidates = get_candidates
+
+    try:
+        yield contador
+    finally:
+        handle.remove()
+        for clase, original in originales.items():
+            clase.get_candidates = original
+
+
+def generar(pipe, messages, decoding, draft=None):
+    """Generar con temperatura 0 y medir tokens/s y aceptación del borrador"""
+    kwargs = model.generation_kwargs(0, 0, 0, MAX_TOKENS, decoding, DRAFT_TOKENS)
+    if decoding == "assisted":
+        draft.generation_config.num_assistant_tokens = DRAFT_TOKENS
+        kwargs["assistant_model"] = draft
+
+    with contar_pasos(pipe) as contador:
+        inicio = time.perf_counter()
+        outputs = pipe(messages, **kwargs)
+        duracion = time.perf_counter() - inicio
+
+    texto = outputs[0]["generated_text"][-1]["content"]
+    tokens = len(pipe.tokenizer.encode(texto, add_special_tokens=False))
+    # Cada pasada del modelo principal acepta k tokens del borrador y añade uno
+    aceptados = max(0, tokens - contador["pasos"])
+    return {
+        "texto": texto,
+        "tokens": tokens,
+        "segundos": duracion,
+        "pasos": contador["pasos"],
+        "aceptados": aceptados,
+        "propuestos": contador["propuestos"],
+    }
+
+
+def main():
+    document_text, api_text = cargar_contexto()
+    pipe = model.manager.load(model.LLM_NAME)
+    draft = model.manager.load(model.DRAFT_NAME)
+
+    filas = []
+    for pregunta in PREGUNTAS:
+        messages = model.build_messages(pregunta, document_text, api_text)
+        referencia = None
+        for etiqueta, decoding in model.DECODING_MODES:
+            r = generar(pipe, messages, decoding, draft)
+            if referencia is None:
+                referencia = r["texto"]
+            filas.append(
+                {
+                    "pregunta": pregunta[:40],
+                    "modo": etiqueta,
+                    "tokens/s": r["tokens"] / r["segundos"],
+                    "tokens/paso": r["tokens"] / max(1, r["pasos"]),
+                    "aceptación": (
+                        r["aceptados"] / r["propuestos"] if r["propuestos"] else None
+                    ),
+                    "igual a estándar": r["texto"] == referencia,
+                }
+            )
+
+    resultados = pd.DataFrame(filas)
+    print(resultados.round(3).to_string(index=False))
+    print()
+    print(
+        resultados.groupby("modo", sort=False)[
+            ["tokens/s", "tokens/paso", "aceptación", "igual a estándar"]
+        ]
+        .mean()
+        .round(3)
+        .to_string()
+    )
+
+
+if __name__ == "__main__":
+    main()
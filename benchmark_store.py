@@ -0,0 +1,96 @@
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from asistentemem.store import TimeSeriesStore
+
+# ===========================
+# 🔹 Comparación CSV vs almacén binario (historia 10 veces más larga)
+# ===========================
+FACTOR = 10
+ULTIMOS_DIAS = 30
+REPETICIONES = 20
+
+
+def historia_sintetica(factor=FACTOR):
+    """Repetir df_scaled.csv con fechas consecutivas hasta ``factor`` veces su largo"""
+    base = pd.read_csv("df_scaled.csv", index_col=0)
+    valores = np.tile(base.values, (factor, 1))
+    fechas = pd.date_range(base.index[0], periods=len(valores), freq="D")
+    fechas.name = "Date"
+    return pd.DataFrame(valores, index=fechas, columns=base.columns)
+
+
+def medir(funcion, repeticiones=REPETICIONES):
+    """Mediana del tiempo de ``funcion`` en milisegundos"""
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return np.median(tiempos) * 1000
+
+
+def main():
+    df = historia_sintetica()
+    nueva_fila = df.iloc[[-1]].copy()
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        ruta_csv = os.path.join(carpeta, "df_scaled.csv")
+        df.to_csv(ruta_csv)
+        store = TimeSeriesStore(os.path.join(carpeta, "df_scaled"))
+        store.replace(df)
+
+        def csv_carga():
+            return pd.read_csv(ruta_csv, index_col=0, parse_dates=True)
+
+        def csv_ultimos():
+            return pd.read_csv(ruta_csv, index_col=0, parse_dates=True).iloc[
+                -ULTIMOS_DIAS:
+            ]
+
+        def store_carga():
+            return TimeSeriesStore(store.path).to_frame()
+
+        def store_ultimos():
+            return TimeSeriesStore(store.path).to_frame(last=ULTIMOS_DIAS)
+
+        def csv_agregar():
+            nueva_fila.index = nueva_fila.index + pd.Timedelta(days=1)
+            nueva_fila.to_csv(ruta_csv, mode="a", header=False)
+
+        def store_agregar():
+            nueva_fila.index = nueva_fila.index + pd.Timedelta(days=1)
+            store.append(nueva_fila)
+
+        resultados = pd.DataFrame(
+            {
+                "CSV (ms)": [
+                    medir(csv_carga),
+                    medir(csv_ultimos),
+                    medir(csv_agregar),
+                ],
+                "Almacén (ms)": [
+                    medir(store_carga),
+                    medir(store_ultimos),
+                    medir(store_agregar),
+                ],
+            },
+            index=[
+                "Carga completa",
+                f"Últimos {ULTIMOS_DIAS} días",
+                "Agregar 1 día",
+            ],
+        )
+        resultados["Aceleración"] = resultados["CSV (ms)"] / resultados["Almacén (ms)"]
+
+        print(f"Historia: {len(df)} días x {df.shape[1]} columnas")
+        print(f"Tamaño CSV: {os.path.getsize(ruta_csv) / 1024:.0f} KB")
+        print(resultados.round(3).to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -5,14 +5,132 @@ import matplotlib.pyplot as plt
 import plotly.graph_objects as go
 import joblib
 import tensorflow as tf
+import time
 from datetime import datetime, timedelta, date
 from workalendar.america import Colombia
 from pydataxm import *
+from asistentemem.lifecycle import ModelLifecycleManager, ModelNotReady
+from asistentemem.store import open_store
+from backtest import RUTA_DATOS, leer_manifiesto, version_modelo
 # pip install scikit-learn
 
-# Cargar el modelo y el scaler
-model = tf.keras.models.load_model("pbolsa.keras")  # Usar el modelo correcto
-scaler = joblib.load("scaler.pkl")  # Asegúrate de tener el scaler guardado
+MODELO_PRECIO = "pbolsa"
+
+
+def cargar_version():
+    """Modelo, scaler e historia escalada de la versión vigente (ver backtest.py)"""
+    # La marca se toma antes de leer el manifiesto: si se publica otra versión
+    # mientras se carga, la siguiente revisión la detecta y vuelve a cargar
+    version = version_modelo()
+    manifiesto = leer_manifiesto()
+    return {
+        "version": version,
+        "modelo": tf.keras.models.load_model(manifiesto["modelo"]),
+        "scaler": joblib.load(manifiesto["scaler"]),
+        "historia": manifiesto["historia"],
+    }
+
+
+def _warmup_modelo(recurso):
+    """Primera predicción en vacío para compilar el grafo antes de usarlo"""
+    model = recurso["modelo"]
+    model.predict(np.zeros((1,) + tuple(model.input_shape[1:])), verbose=0)
+
+
+def _liberar_modelo(recurso):
+    """Liberar el grafo de Keras asociado al modelo"""
+    tf.keras.backend.clear_session()
+
+
+@st.cache_resource
+def obtener_gestor():
+    """Gestor del ciclo de vida del modelo, compartido entre reruns de Streamlit"""
+    gestor = ModelLifecycleManager(idle_timeout=10 * 60)
+    gestor.register(
+        MODELO_PRECIO,
+        loader=cargar_version,
+        unloader=_liberar_modelo,
+        warmup=_warmup_modelo,
+    )
+    return gestor
+
+
+def recargar_si_cambio(gestor):
+    """Descargar el modelo si backtest.py publicó otra versión; la siguiente
+    adquisición carga la nueva (si está en uso, se descarga al liberarse)"""
+    try:
+        with gestor.acquire(MODELO_PRECIO, wait=False) as recurso:
+            version = recurso["version"]
+    except ModelNotReady:
+        return  # Se está cargando la versión vigente
+    if version != version_modelo():
+        print("[DEBUG] Nueva versión del modelo de precio; recargando")
+        gestor.unload(MODELO_PRECIO, reason="reload")
+
+
+# Variables que se pueden barrer: (etiqueta, mínimo, máximo)
+VARIABLES_BARRIDO = {
+    "Capacidad_embalse": ("Capacidad embalse", 1e9, 2e10),
+    "Demanda_real": ("Demanda real", 1e6, 10e6),
+    "Precio_escasez": ("Precio de escasez", 0.0, 2000.0),
+}
+LOTE_PREDICCION = 4096  # Ventanas por pasada del modelo (acota la memoria)
+MAX_EVALUACIONES_BARRIDO = 200_000  # Limita las muestras MC en mallas grandes
+
+
+def tiene_dropout(model):
+    """Indica si el modelo tiene capas con dropout (necesario para MC dropout)"""
+    for capa in model.layers:
+        if isinstance(capa, tf.keras.layers.Dropout):
+            return True
+        if getattr(capa, "dropout", 0) or getattr(capa, "recurrent_dropout", 0):
+            return True
+    return False
+
+
+def construir_entradas(muestras, historia, scaler):
+    """Ventanas (n, 30, 13): los mismos últimos 29 días + cada muestra escalada"""
+    muestras_scaled = scaler.transform(muestras)
+    X = np.empty(
+        (len(muestras_scaled), len(historia) + 1, historia.shape[1]), dtype=np.float32
+    )
+    X[:, :-1] = historia
+    X[:, -1] = muestras_scaled
+    return X
+
+
+def predecir_lote(model, X, n_mc=0):
+    """Predicción normalizada de todas las ventanas en pasadas vectorizadas.
+
+    Con ``n_mc > 0`` se hace MC dropout (dropout activo en inferencia) y se
+    devuelve un array (n_mc, n); si no, un array (n,) determinista.
+    """
+    if n_mc <= 0:
+        return model.predict(X, batch_size=LOTE_PREDICCION, verbose=0).reshape(-1)
+
+    # Se repiten las ventanas para correr varias muestras en la misma pasada
+    por_lote = max(1, LOTE_PREDICCION // len(X))
+    muestras = []
+    for inicio in range(0, n_mc, por_lote):
+        k = min(por_lote, n_mc - inicio)
+        salida = model(np.tile(X, (k, 1, 1)), training=True).numpy()
+        muestras.append(salida.reshape(k, len(X)))
+    return np.concatenate(muestras)
+
+
+def desnormalizar(valores, scaler, columnas):
+    """Llevar predicciones normalizadas de Precio_bolsa a unidades de precio"""
+    valores = np.asarray(valores)
+    columna = columnas.get_loc("Precio_bolsa")
+    temp_array = np.zeros((valores.size, len(columnas)))
+    temp_array[:, columna] = valores.ravel()
+    return scaler.inverse_transform(temp_array)[:, columna].reshape(valores.shape)
+
+
+# El modelo y el scaler se cargan bajo demanda (ver obtener_gestor) y se
+# recargan en caliente cuando backtest.py publica una versión nueva
+gestor = obtener_gestor()
+recargar_si_cambio(gestor)
 
 
 # Configurar la aplicación
@@ -23,11 +141,6 @@ st.image(
 )
 
 
-# ===========================
-# 🔹 2️⃣ Cargar los Últimos 30 Días de Datos Normalizados
-# ===========================
-df_scaled = pd.read_csv("df_scaled.csv", index_col=0)
-
 # ===========================
 # 🔹 4️⃣ Entrada de Datos del Usuario
 # ===========================
@@ -50,6 +163,40 @@ temperatura = st.sidebar.slider(
     "Temperatura", min_value=0.0, max_value=50.0, value=25.0, step=0.1
 )
 
+# ===========================
+# 🔹 Barrido de Escenarios e Intervalos
+# ===========================
+st.sidebar.header("Escenarios")
+modo_barrido = st.sidebar.checkbox("Activar barrido de escenarios")
+rangos_barrido = {}
+if modo_barrido:
+    variables_barrido = st.sidebar.multiselect(
+        "Variables a barrer (máx. 2)",
+        list(VARIABLES_BARRIDO),
+        default=["Capacidad_embalse"],
+        max_selections=2,
+    )
+    puntos_barrido = st.sidebar.slider(
+        "Puntos por variable", min_value=5, max_value=50, value=20
+    )
+    for variable in variables_barrido:
+        etiqueta, minimo, maximo = VARIABLES_BARRIDO[variable]
+        rangos_barrido[variable] = st.sidebar.slider(
+            f"Rango {etiqueta}",
+            min_value=minimo,
+            max_value=maximo,
+            value=(minimo, maximo),
+        )
+intervalos = st.sidebar.checkbox("Intervalos de predicción (MC dropout)")
+n_mc = 0
+if intervalos:
+    n_mc = st.sidebar.slider(
+        "Muestras Monte Carlo", min_value=50, max_value=2000, value=500, step=50
+    )
+    confianza = st.sidebar.slider(
+        "Nivel de confianza", min_value=0.5, max_value=0.99, value=0.9, step=0.01
+    )
+
 # ===========================
 # 🔹 5️⃣ Determinar si es Día Festivo
 # ===========================
@@ -90,54 +237,168 @@ st.write(f"- **Irradiación:** {irradiacion}")
 st.write(f"- **Temperatura:** {temperatura}")
 
 # ===========================
-# 🔹 7️⃣ Normalizar la Nueva Muestra
+# 🔹 2️⃣ Cargar el Modelo y los Últimos 30 Días de Datos Normalizados
 # ===========================
-nueva_muestra_scaled = scaler.transform(nueva_muestra)
-nueva_muestra_scaled_df = pd.DataFrame(nueva_muestra_scaled, columns=df_scaled.columns)
+# Modelo, scaler e historia escalada son de la misma versión y se usan juntos
+# durante todo el rerun. La historia vive en el almacén binario (se crea desde
+# el CSV la primera vez); solo se leen los últimos 30 días, sin copiar el resto
+with gestor.acquire(MODELO_PRECIO) as recurso:
+    model, scaler = recurso["modelo"], recurso["scaler"]
+    historia_escalada = open_store(recurso["historia"], csv_fallback=RUTA_DATOS)
+    df_scaled = historia_escalada.to_frame(last=30)
 
-# ===========================
-# 🔹 8️⃣ Usar los Últimos 30 Días + Nueva Muestra
-# ===========================
-seq_length = 30
-last_30_days = df_scaled.iloc[-seq_length:].copy()  # Tomar los últimos 30 días
-last_30_days = pd.concat(
-    [last_30_days, nueva_muestra_scaled_df], ignore_index=True
-)  # Agregar nueva muestra
-print(last_30_days)
-# ===========================
-# 🔹 9️⃣ Formatear los Datos para el Modelo
-# ===========================
-X_input = np.array(last_30_days[-seq_length:]).reshape(
-    1, seq_length, df_scaled.shape[1]
-)
+    # ===========================
+    # 🔹 7️⃣ Normalizar la Nueva Muestra
+    # ===========================
+    nueva_muestra_scaled = scaler.transform(nueva_muestra)
+    nueva_muestra_scaled_df = pd.DataFrame(
+        nueva_muestra_scaled, columns=df_scaled.columns
+    )
 
-# ===========================
-# 🔹 🔟 Hacer la Predicción
-# ===========================
-precio_predicho_normalizado = model.predict(X_input)
-precio_predicho_normalizado
-# ===========================
-# 🔹 1️⃣1️⃣ Desnormalizar el Resultado
-# ===========================
+    # ===========================
+    # 🔹 8️⃣ Usar los Últimos 30 Días + Nueva Muestra
+    # ===========================
+    seq_length = 30
+    last_30_days = df_scaled.iloc[-seq_length:].copy()  # Tomar los últimos 30 días
+    last_30_days = pd.concat(
+        [last_30_days, nueva_muestra_scaled_df], ignore_index=True
+    )  # Agregar nueva muestra
+    print(last_30_days)
+    # ===========================
+    # 🔹 9️⃣ Formatear los Datos para el Modelo
+    # ===========================
+    X_input = np.array(last_30_days[-seq_length:]).reshape(
+        1, seq_length, df_scaled.shape[1]
+    )
 
-# Crear un array temporal para desnormalizar correctamente
-temp_array = np.zeros(
-    (1, df_scaled.shape[1])
-)  # Un array con ceros del mismo tamaño que los datos
-temp_array[:, df_scaled.columns.get_loc("Precio_bolsa")] = (
-    precio_predicho_normalizado  # Solo rellenamos la columna a predecir
-)
+    # ===========================
+    # 🔹 🔟 Hacer la Predicción
+    # ===========================
+    precio_predicho_normalizado = model.predict(X_input)
+    # ===========================
+    # 🔹 1️⃣1️⃣ Desnormalizar el Resultado
+    # ===========================
 
-# Aplicar inverse_transform sobre toda la estructura
-precio_predicho = scaler.inverse_transform(temp_array)[
-    :, df_scaled.columns.get_loc("Precio_bolsa")
-]
+    # Crear un array temporal para desnormalizar correctamente
+    temp_array = np.zeros(
+        (1, df_scaled.shape[1])
+    )  # Un array con ceros del mismo tamaño que los datos
+    temp_array[:, df_scaled.columns.get_loc("Precio_bolsa")] = (
+        precio_predicho_normalizado  # Solo rellenamos la columna a predecir
+    )
 
-# ===========================
-# 🔹 1️⃣2️⃣ Mostrar el Resultado en Streamlit
-# ===========================
-st.markdown("### Predicción")
-st.metric(label="📈 Predicción del Precio de Bolsa", value=f"{precio_predicho[0]:.2f}")
+    # Aplicar inverse_transform sobre toda la estructura
+    precio_predicho = scaler.inverse_transform(temp_array)[
+        :, df_scaled.columns.get_loc("Precio_bolsa")
+    ]
+
+    # ===========================
+    # 🔹 1️⃣2️⃣ Mostrar el Resultado en Streamlit
+    # ===========================
+    st.markdown("### Predicción")
+    st.metric(
+        label="📈 Predicción del Precio de Bolsa", value=f"{precio_predicho[0]:.2f}"
+    )
+
+    # ===========================
+    # 🔹 1️⃣3️⃣ Intervalo de Predicción y Barrido de Escenarios
+    # ===========================
+    historia = df_scaled.iloc[-(seq_length - 1) :].values
+    cuantiles = None
+    if intervalos:
+        cuantiles = [(1 - confianza) / 2, 0.5, (1 + confianza) / 2]
+
+    if intervalos or (modo_barrido and rangos_barrido):
+        if intervalos and not tiene_dropout(model):
+            st.warning(
+                "El modelo no tiene capas de dropout: las muestras Monte Carlo "
+                "coinciden y el intervalo tiene ancho cero."
+            )
+
+        if intervalos:
+            inicio = time.perf_counter()
+            X_punto = construir_entradas(nueva_muestra, historia, scaler)
+            muestras_mc = desnormalizar(
+                predecir_lote(model, X_punto, n_mc), scaler, df_scaled.columns
+            )[:, 0]
+            bajo, mediana, alto = np.quantile(muestras_mc, cuantiles)
+            st.write(
+                f"- **Intervalo {confianza:.0%}:** {bajo:.2f} – {alto:.2f} "
+                f"(mediana {mediana:.2f}, {n_mc} muestras en "
+                f"{time.perf_counter() - inicio:.2f}s)"
+            )
+
+        if modo_barrido and rangos_barrido:
+            st.markdown("### Barrido de escenarios")
+            variables = list(rangos_barrido)
+            ejes = [
+                np.linspace(*rangos_barrido[variable], puntos_barrido)
+                for variable in variables
+            ]
+            malla = np.meshgrid(*ejes, indexing="ij")
+
+            # Todas las combinaciones de la malla en un solo DataFrame
+            escenarios = pd.concat([nueva_muestra] * malla[0].size, ignore_index=True)
+            for variable, valores in zip(variables, malla):
+                escenarios[variable] = valores.ravel()
+
+            # En mallas grandes se reducen las muestras MC por escenario
+            n_mc_barrido = n_mc
+            if intervalos:
+                n_mc_barrido = max(
+                    2, min(n_mc, MAX_EVALUACIONES_BARRIDO // len(escenarios))
+                )
+
+            inicio = time.perf_counter()
+            X_barrido = construir_entradas(escenarios, historia, scaler)
+            precios = desnormalizar(
+                predecir_lote(model, X_barrido, n_mc_barrido),
+                scaler,
+                df_scaled.columns,
+            )
+            duracion = time.perf_counter() - inicio
+
+            etiquetas = [VARIABLES_BARRIDO[variable][0] for variable in variables]
+            if intervalos:
+                bandas = np.quantile(precios, cuantiles, axis=0)
+                centro = bandas[1]
+            else:
+                centro = precios
+
+            figura = go.Figure()
+            if len(variables) == 1:
+                if intervalos:
+                    figura.add_trace(
+                        go.Scatter(
+                            x=np.concatenate([ejes[0], ejes[0][::-1]]),
+                            y=np.concatenate([bandas[2], bandas[0][::-1]]),
+                            fill="toself",
+                            line={"width": 0},
+                            opacity=0.3,
+                            name=f"Intervalo {confianza:.0%}",
+                        )
+                    )
+                figura.add_trace(go.Scatter(x=ejes[0], y=centro, name="Predicción"))
+                figura.update_layout(
+                    xaxis_title=etiquetas[0], yaxis_title="Precio de bolsa"
+                )
+            else:
+                figura.add_trace(
+                    go.Heatmap(
+                        x=ejes[1],
+                        y=ejes[0],
+                        z=centro.reshape(malla[0].shape),
+                        colorbar={"title": "Precio"},
+                    )
+                )
+                figura.update_layout(xaxis_title=etiquetas[1], yaxis_title=etiquetas[0])
+            st.plotly_chart(figura)
+            evaluaciones = len(X_barrido) * max(n_mc_barrido, 1)
+            st.caption(f"{evaluaciones} evaluaciones del modelo en {duracion:.2f}s")
+
+
+st.sidebar.markdown("---")
+st.sidebar.markdown(gestor.status_markdown())
 
 
 # ===========================
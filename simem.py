@@ -1,6 +1,8 @@
+import glob
 import requests
 import pandas as pd
 from datetime import datetime, timedelta
+from asistentemem.store import open_store
 
 # URL de la API
 url = "https://www.simem.co/backend-files/api/PublicData"
@@ -8,13 +10,24 @@ url = "https://www.simem.co/backend-files/api/PublicData"
 # Parámetros iniciales para obtener datos recientes
 params = {"datasetid": "ae3f23"}
 
+# Historia del dataset (el mismo almacén que usa el chat al consultar la API);
+# la primera vez se carga con los CSV anteriores
+historia = open_store(f"simem_{params['datasetid']}")
+if not historia.exists():
+    for archivo in sorted(glob.glob("precios_escasez_*.csv")):
+        historia.append(pd.read_csv(archivo, index_col=0))
+
 # Realizar la solicitud GET a la API
 response = requests.get(url, params=params)
 
 if response.status_code == 200:
     data = response.json()
-    
-    if "result" in data and "records" in data["result"] and len(data["result"]["records"]) > 0:
+
+    if (
+        "result" in data
+        and "records" in data["result"]
+        and len(data["result"]["records"]) > 0
+    ):
         # Convertir los registros en DataFrame
         records = data["result"]["records"]
         df = pd.DataFrame(records)
@@ -26,21 +39,18 @@ if response.status_code == 200:
         hoy = datetime.today()
         inicio_mes_anterior = hoy - timedelta(days=30)
 
-        # Filtrar los datos desde hace 30 días hasta hoy
-        df_filtrado = df[(df["Fecha"] >= inicio_mes_anterior) & (df["Fecha"] <= hoy)]
-
         # Pivotear la tabla para que "CodigoVariable" sean columnas y "Valor" su contenido
-        df_pivot = df_filtrado.pivot(index="Fecha", columns="CodigoVariable", values="Valor")
+        df_pivot = df.pivot(index="Fecha", columns="CodigoVariable", values="Valor")
 
         # Resetear el nombre del índice
         df_pivot.columns.name = None
 
-        # Mostrar el DataFrame transformado
-        print(df_pivot)
+        # Agregar al almacén (las fechas ya guardadas se actualizan)
+        historia.append(df_pivot)
+
+        # Mostrar los datos desde hace 30 días hasta hoy
+        print(historia.to_frame().loc[inicio_mes_anterior:hoy])
 
-        # Guardar en un archivo CSV
-        df_pivot.to_csv("precios_escasez_ultimos_30_dias.csv", index=True)
-        
     else:
         print("No hay datos disponibles en la API.")
 